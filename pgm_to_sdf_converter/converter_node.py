@@ -22,6 +22,7 @@ The converter automatically:
 import sys
 import os
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from .map_metadata import MapMetadata
 from .pgm_parser import PGMParser
 from .wall_aggregation_extractor import WallAggregationExtractor
@@ -75,7 +76,7 @@ class PGMToSDFConverter:
             keep_cleaned_pgm: Keep the cleaned PGM file when enhancement is applied (default: False)
 
         Returns:
-            SDF content as string
+            Path to the written SDF file
         """
         enhanced_pgm_path = None
         self.keep_cleaned_pgm = keep_cleaned_pgm
@@ -86,7 +87,6 @@ class PGMToSDFConverter:
 
         self.metadata = MapMetadata(yaml_path)
 
-        pgm_path_to_use = self.metadata.image_path
         try:
             temp_parser = PGMParser(self.metadata.image_path)
             original_data = temp_parser.get_image_data()
@@ -97,23 +97,22 @@ class PGMToSDFConverter:
             )
 
             if was_enhanced:
+                # Use the enhanced array directly; writing a temp PGM and
+                # re-parsing it is only needed when the user wants the file.
+                self.pgm_parser = PGMParser.from_array(enhanced_data)
+
                 if keep_cleaned_pgm:
                     original_dir = os.path.dirname(self.metadata.image_path)
                     enhanced_pgm_path = enhancer.save_enhanced_pgm(
                         self.metadata.image_path, enhanced_data, temp_dir=original_dir
                     )
-                else:
-                    enhanced_pgm_path = enhancer.save_enhanced_pgm(
-                        self.metadata.image_path, enhanced_data
-                    )
-                pgm_path_to_use = enhanced_pgm_path
+            else:
+                self.pgm_parser = temp_parser
 
         except Exception as e:
             print(f"\n⚠️  Enhancement failed: {e}")
             print(f"   → Using original image\n")
-            pgm_path_to_use = self.metadata.image_path
-
-        self.pgm_parser = PGMParser(pgm_path_to_use)
+            self.pgm_parser = PGMParser(self.metadata.image_path)
 
         print(f"\n📊 Map Properties:")
         print(f"   Resolution:  {self.metadata.resolution} m/pixel")
@@ -140,15 +139,16 @@ class PGMToSDFConverter:
 
         print("\n🔧 Generating SDF world file...")
         self.sdf_generator = SDFGenerator(world_name=world_name)
-        sdf_content = self.sdf_generator.generate(
-            walls=walls, ground_size=None, wall_height=wall_height
-        )
 
         if output_path is None:
             yaml_base = os.path.splitext(yaml_path)[0]
             output_path = yaml_base + ".sdf"
 
-        self.sdf_generator.save_to_file(sdf_content, output_path)
+        # Stream the XML straight to disk; holding the full document as
+        # a string doubles peak memory for worlds with many walls.
+        self.sdf_generator.generate_to_file(
+            walls, output_path, ground_size=None, wall_height=wall_height
+        )
 
         print("\n" + "=" * 70)
         print("  ✓ CONVERSION COMPLETE")
@@ -156,17 +156,42 @@ class PGMToSDFConverter:
         print(f"\n📁 Output:  {output_path}")
 
         if enhanced_pgm_path is not None:
-            if keep_cleaned_pgm:
-                print(f"💾 Cleaned: {enhanced_pgm_path}")
-            else:
-                try:
-                    os.remove(enhanced_pgm_path)
-                except Exception:
-                    pass
+            print(f"💾 Cleaned: {enhanced_pgm_path}")
 
         print()
 
-        return sdf_content
+        return output_path
+
+
+def _resolve_yaml_path(yaml_file: str) -> str:
+    """Resolve a map argument given with or without its YAML extension."""
+    if not yaml_file.endswith(".yaml") and not yaml_file.endswith(".yml"):
+        yaml_file_with_ext = yaml_file + ".yaml"
+        if os.path.exists(yaml_file_with_ext):
+            return yaml_file_with_ext
+        yaml_file_with_yml = yaml_file + ".yml"
+        if os.path.exists(yaml_file_with_yml):
+            return yaml_file_with_yml
+    return yaml_file
+
+
+def _convert_one(yaml_file: str, convert_kwargs: dict) -> str:
+    """
+    Convert a single map file.
+
+    Module-level so ProcessPoolExecutor can pickle it when conversions
+    are dispatched across worker processes.
+
+    Args:
+        yaml_file: Path to the YAML metadata file
+        convert_kwargs: Keyword arguments for PGMToSDFConverter.convert
+
+    Returns:
+        The input path (useful for progress reporting)
+    """
+    converter = PGMToSDFConverter()
+    converter.convert(yaml_path=yaml_file, **convert_kwargs)
+    return yaml_file
 
 
 def main(args=None):
@@ -207,9 +232,11 @@ Note:
     )
 
     parser.add_argument(
-        "yaml_file",
+        "yaml_files",
         type=str,
-        help="Path to occupancy map YAML metadata file (with or without .yaml extension)",
+        nargs="+",
+        metavar="yaml_file",
+        help="Path(s) to occupancy map YAML metadata files (with or without .yaml extension)",
     )
 
     parser.add_argument(
@@ -268,41 +295,66 @@ Note:
         help="Keep the cleaned PGM file (saves next to original instead of deleting)",
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Number of parallel worker processes when converting multiple maps (default: 1)",
+    )
+
     # Parse arguments
     if args is None:
         args = parser.parse_args()
     else:
         args = parser.parse_args(args)
 
-    yaml_file = args.yaml_file
-    if not yaml_file.endswith(".yaml") and not yaml_file.endswith(".yml"):
-        yaml_file_with_ext = yaml_file + ".yaml"
-        if os.path.exists(yaml_file_with_ext):
-            yaml_file = yaml_file_with_ext
-        else:
-            yaml_file_with_yml = yaml_file + ".yml"
-            if os.path.exists(yaml_file_with_yml):
-                yaml_file = yaml_file_with_yml
-
-    if not os.path.exists(yaml_file):
-        print(f"Error: YAML file not found: {yaml_file}", file=sys.stderr)
-        if yaml_file != args.yaml_file:
-            print(f"       Also tried: {args.yaml_file}", file=sys.stderr)
+    yaml_files = []
+    for given in args.yaml_files:
+        yaml_file = _resolve_yaml_path(given)
+
+        if not os.path.exists(yaml_file):
+            print(f"Error: YAML file not found: {yaml_file}", file=sys.stderr)
+            if yaml_file != given:
+                print(f"       Also tried: {given}", file=sys.stderr)
+            return 1
+
+        yaml_files.append(yaml_file)
+
+    if len(yaml_files) > 1 and args.output is not None:
+        print(
+            "Error: -o/--output cannot be combined with multiple input maps",
+            file=sys.stderr,
+        )
         return 1
 
+    convert_kwargs = dict(
+        output_path=args.output,
+        wall_height=args.wall_height,
+        min_wall_size=args.min_wall_size,
+        min_wall_length=args.min_wall_length,
+        world_name=args.world_name,
+        enable_merging=not args.no_merge,
+        merge_tolerance=args.merge_tolerance,
+        keep_cleaned_pgm=args.keep_cleaned_pgm,
+    )
+
     try:
-        converter = PGMToSDFConverter()
-        converter.convert(
-            yaml_path=yaml_file,
-            output_path=args.output,
-            wall_height=args.wall_height,
-            min_wall_size=args.min_wall_size,
-            min_wall_length=args.min_wall_length,
-            world_name=args.world_name,
-            enable_merging=not args.no_merge,
-            merge_tolerance=args.merge_tolerance,
-            keep_cleaned_pgm=args.keep_cleaned_pgm,
-        )
+        if len(yaml_files) == 1 or args.jobs == 1:
+            for yaml_file in yaml_files:
+                _convert_one(yaml_file, convert_kwargs)
+        else:
+            # Conversions are independent per map; a process pool sidesteps
+            # the GIL in the pure-Python stages and scales with cores.
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                futures = {
+                    executor.submit(_convert_one, yaml_file, convert_kwargs): yaml_file
+                    for yaml_file in yaml_files
+                }
+                for future in as_completed(futures):
+                    future.result()
+
         return 0
 
     except Exception as e:
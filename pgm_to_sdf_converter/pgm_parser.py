@@ -5,6 +5,7 @@ Parses PGM (Portable Gray Map) image files used in ROS occupancy grid maps.
 Supports both P2 (ASCII) and P5 (binary) PGM formats.
 """
 
+import re
 import numpy as np
 from typing import Tuple
 
@@ -12,14 +13,17 @@ from typing import Tuple
 class PGMParser:
     """Class to parse PGM image files."""
 
-    def __init__(self, pgm_path: str):
+    def __init__(self, pgm_path: str, use_mmap: bool = True):
         """
         Initialize PGMParser and load the PGM file.
 
         Args:
             pgm_path: Path to the PGM file
+            use_mmap: Memory-map binary pixel data instead of reading it
+                      into RAM (default: True)
         """
         self.pgm_path = pgm_path
+        self.use_mmap = use_mmap
         self.width = 0
         self.height = 0
         self.max_val = 0
@@ -27,9 +31,41 @@ class PGMParser:
 
         self._parse()
 
-    def _parse(self):
-        """Parse the PGM file."""
-        with open(self.pgm_path, "rb") as f:
+    @classmethod
+    def from_array(cls, image_data: np.ndarray, max_val: int = 255) -> "PGMParser":
+        """
+        Build a PGMParser directly from a preloaded image array.
+
+        Useful when the image data already lives in memory (e.g. after
+        enhancement) and a file write + re-parse round trip would be wasted.
+
+        Args:
+            image_data: Image array of shape (height, width)
+            max_val: Maximum pixel value (default: 255)
+
+        Returns:
+            PGMParser instance wrapping the given array
+        """
+        parser = cls.__new__(cls)
+        parser.pgm_path = "<memory>"
+        parser.height, parser.width = image_data.shape
+        parser.max_val = max_val
+        parser.image_data = image_data
+        return parser
+
+    @staticmethod
+    def read_header(pgm_path: str) -> Tuple[str, int, int, int, int]:
+        """
+        Read only the PGM header, without touching the pixel data.
+
+        Args:
+            pgm_path: Path to the PGM file
+
+        Returns:
+            Tuple of (magic, width, height, max_val, data_offset) where
+            data_offset is the byte offset of the first pixel value
+        """
+        with open(pgm_path, "rb") as f:
             # Read magic number
             magic = f.readline().decode("ascii").strip()
 
@@ -45,22 +81,31 @@ class PGMParser:
 
             # Read dimensions
             dimensions = line.split()
-            self.width = int(dimensions[0])
-            self.height = int(dimensions[1])
+            width = int(dimensions[0])
+            height = int(dimensions[1])
 
             # Read max value
             line = f.readline().decode("ascii").strip()
             while line.startswith("#"):
                 line = f.readline().decode("ascii").strip()
-            self.max_val = int(line)
+            max_val = int(line)
+
+            return magic, width, height, max_val, f.tell()
 
-            # Read image data
-            if magic == "P2":
-                # ASCII format
+    def _parse(self):
+        """Parse the PGM file."""
+        magic, self.width, self.height, self.max_val, data_offset = self.read_header(
+            self.pgm_path
+        )
+
+        if magic == "P2":
+            # ASCII format
+            with open(self.pgm_path, "rb") as f:
+                f.seek(data_offset)
                 self.image_data = self._read_ascii(f)
-            elif magic == "P5":
-                # Binary format
-                self.image_data = self._read_binary(f)
+        elif magic == "P5":
+            # Binary format
+            self.image_data = self._read_binary(data_offset)
 
     def _read_ascii(self, file) -> np.ndarray:
         """
@@ -72,30 +117,51 @@ class PGMParser:
         Returns:
             numpy array of image data
         """
-        data = []
-        for line in file:
-            line = line.decode("ascii").strip()
-            if line and not line.startswith("#"):
-                data.extend([int(x) for x in line.split()])
+        # Strip comments once and hand the whole blob to NumPy's C parser
+        # instead of converting pixel-by-pixel through a Python list.
+        text = re.sub(rb"#[^\n]*", b"", file.read()).decode("ascii")
+
+        dtype = np.uint16 if self.max_val >= 256 else np.uint8
+        data = np.fromstring(text, dtype=np.int32, sep=" ").astype(dtype, copy=False)
 
-        return np.array(data, dtype=np.uint8).reshape((self.height, self.width))
+        return data.reshape((self.height, self.width))
 
-    def _read_binary(self, file) -> np.ndarray:
+    def _read_binary(self, data_offset: int) -> np.ndarray:
         """
         Read binary format PGM data.
 
+        Memory-maps the pixel region read-only so the OS pages data in on
+        demand instead of copying the whole image into RAM up front.
+
         Args:
-            file: File object positioned at image data
+            data_offset: Byte offset of the pixel data in the file
 
         Returns:
             numpy array of image data
         """
         if self.max_val < 256:
             # Single byte per pixel
-            data = np.frombuffer(file.read(), dtype=np.uint8)
+            dtype = np.dtype(np.uint8)
         else:
-            # Two bytes per pixel
-            data = np.frombuffer(file.read(), dtype=np.uint16)
+            # Two bytes per pixel, big-endian per the PGM specification
+            dtype = np.dtype(">u2")
+
+        if self.use_mmap:
+            return np.memmap(
+                self.pgm_path,
+                dtype=dtype,
+                mode="r",
+                offset=data_offset,
+                shape=(self.height, self.width),
+            )
+
+        # Preallocate the destination and read straight into it; going
+        # through f.read() would allocate an intermediate bytes object
+        # and keep it alive behind the frombuffer view.
+        data = np.empty(self.height * self.width, dtype=dtype)
+        with open(self.pgm_path, "rb") as f:
+            f.seek(data_offset)
+            f.readinto(data)
 
         return data.reshape((self.height, self.width))
 
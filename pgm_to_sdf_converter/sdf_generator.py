@@ -2,15 +2,46 @@
 Gazebo SDF World File Generator
 
 Generates Gazebo SDF (Simulation Description Format) world files from wall segments.
-Creates properly formatted XML with physics, lighting, and collision properties
+Writes properly formatted XML with physics, lighting, and collision properties
 for simulation in Gazebo.
 """
 
+import numpy as np
+from io import StringIO
 from typing import List, Tuple
-from xml.etree import ElementTree as ET
-from xml.dom import minidom
 from .wall_aggregation_extractor import Wall
 
+# Per-wall model block, built once; every wall differs only in its name,
+# pose, and box size, so emission is a single format + write per wall.
+_WALL_TEMPLATE = """\
+    <model name="wall_{index}">
+      <static>true</static>
+      <pose>{x} {y} {z} 0 0 {angle}</pose>
+      <link name="link">
+        <collision name="collision">
+          <geometry>
+            <box>
+              <size>{box_x} {box_y} {box_z}</size>
+            </box>
+          </geometry>
+        </collision>
+        <visual name="visual">
+          <geometry>
+            <box>
+              <size>{box_x} {box_y} {box_z}</size>
+            </box>
+          </geometry>
+          <material>
+            <script>
+              <uri>file://media/materials/scripts/gazebo.material</uri>
+              <name>Gazebo/White</name>
+            </script>
+          </material>
+        </visual>
+      </link>
+    </model>
+"""
+
 
 class SDFGenerator:
     """Class to generate Gazebo SDF world files."""
@@ -31,234 +62,201 @@ class SDFGenerator:
         ground_size: Tuple[float, float] = None,
         wall_height: float = 2.5,
         wall_thickness: float = 0.15,
+        out=None,
     ) -> str:
         """
         Generate SDF world file content.
 
+        The XML is written directly to a string buffer; building an
+        ElementTree and re-parsing it through minidom just for
+        pretty-printing would double the work for worlds with thousands
+        of walls. Passing an open text file as ``out`` streams the XML
+        to disk incrementally, so the full document never has to exist
+        in memory at once.
+
         Args:
             walls: List of Wall objects
             ground_size: Size of ground plane (width, length). If None, calculated from walls
             wall_height: Height of walls in meters
             wall_thickness: Thickness of walls in meters
+            out: Writable text file object to stream into (optional)
 
         Returns:
-            SDF XML content as string
+            SDF XML content as string, or None when streaming to out
         """
-        # Create root SDF element
-        sdf = ET.Element("sdf", version=self.sdf_version)
-
-        # Create world element
-        world = ET.SubElement(sdf, "world", name=self.world_name)
+        buf = StringIO() if out is None else out
 
-        # Add physics
-        self._add_physics(world)
+        buf.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        buf.write(f'<sdf version="{self.sdf_version}">\n')
+        buf.write(f'  <world name="{self.world_name}">\n')
 
-        # Add lighting
-        self._add_sun(world)
+        self._write_physics(buf)
+        self._write_sun(buf)
+        self._write_ground_plane(buf, ground_size, walls)
 
-        # Add ground plane
-        self._add_ground_plane(world, ground_size, walls)
-
-        # Add all walls
         for i, wall in enumerate(walls):
-            self._add_wall(world, wall, i, wall_height, wall_thickness)
-
-        # Convert to pretty-printed string
-        return self._prettify(sdf)
-
-    def _add_physics(self, world: ET.Element):
-        """Add physics configuration to world."""
-        physics = ET.SubElement(
-            world, "physics", name="default_physics", default="0", type="ode"
+            self._write_wall(buf, wall, i, wall_height, wall_thickness)
+
+        buf.write("  </world>\n")
+        buf.write("</sdf>\n")
+
+        if out is not None:
+            return None
+        return buf.getvalue()
+
+    def _write_physics(self, buf: StringIO):
+        """Write physics configuration to the buffer."""
+        buf.write(
+            "    <physics name=\"default_physics\" default=\"0\" type=\"ode\">\n"
+            "      <max_step_size>0.001</max_step_size>\n"
+            "      <real_time_factor>1</real_time_factor>\n"
+            "      <real_time_update_rate>1000</real_time_update_rate>\n"
+            "    </physics>\n"
         )
 
-        # Max step size
-        max_step_size = ET.SubElement(physics, "max_step_size")
-        max_step_size.text = "0.001"
-
-        # Real time factor
-        real_time_factor = ET.SubElement(physics, "real_time_factor")
-        real_time_factor.text = "1"
-
-        # Real time update rate
-        real_time_update_rate = ET.SubElement(physics, "real_time_update_rate")
-        real_time_update_rate.text = "1000"
-
-    def _add_sun(self, world: ET.Element):
-        """Add sun light source to world."""
-        light = ET.SubElement(world, "light", name="sun", type="directional")
-
-        # Cast shadows
-        cast_shadows = ET.SubElement(light, "cast_shadows")
-        cast_shadows.text = "1"
-
-        # Pose
-        pose = ET.SubElement(light, "pose")
-        pose.text = "0 0 10 0 0 0"
-
-        # Diffuse color (white)
-        diffuse = ET.SubElement(light, "diffuse")
-        diffuse.text = "0.8 0.8 0.8 1"
-
-        # Specular color
-        specular = ET.SubElement(light, "specular")
-        specular.text = "0.2 0.2 0.2 1"
-
-        # Attenuation
-        attenuation = ET.SubElement(light, "attenuation")
-        range_elem = ET.SubElement(attenuation, "range")
-        range_elem.text = "1000"
-        constant = ET.SubElement(attenuation, "constant")
-        constant.text = "0.9"
-        linear = ET.SubElement(attenuation, "linear")
-        linear.text = "0.01"
-        quadratic = ET.SubElement(attenuation, "quadratic")
-        quadratic.text = "0.001"
-
-        # Direction
-        direction = ET.SubElement(light, "direction")
-        direction.text = "-0.5 0.1 -0.9"
+    def _write_sun(self, buf: StringIO):
+        """Write the sun light source to the buffer."""
+        buf.write(
+            "    <light name=\"sun\" type=\"directional\">\n"
+            "      <cast_shadows>1</cast_shadows>\n"
+            "      <pose>0 0 10 0 0 0</pose>\n"
+            "      <diffuse>0.8 0.8 0.8 1</diffuse>\n"
+            "      <specular>0.2 0.2 0.2 1</specular>\n"
+            "      <attenuation>\n"
+            "        <range>1000</range>\n"
+            "        <constant>0.9</constant>\n"
+            "        <linear>0.01</linear>\n"
+            "        <quadratic>0.001</quadratic>\n"
+            "      </attenuation>\n"
+            "      <direction>-0.5 0.1 -0.9</direction>\n"
+            "    </light>\n"
+        )
 
-    def _add_ground_plane(
-        self, world: ET.Element, ground_size: Tuple[float, float], walls: List[Wall]
+    def _write_ground_plane(
+        self, buf: StringIO, ground_size: Tuple[float, float], walls: List[Wall]
     ):
-        """Add ground plane to world."""
+        """Write the ground plane to the buffer."""
         # Calculate ground size if not provided
         if ground_size is None:
             if walls:
-                # Calculate bounding box from walls
-                min_x = min(w.x - w.width / 2 for w in walls)
-                max_x = max(w.x + w.width / 2 for w in walls)
-                min_y = min(w.y - w.length / 2 for w in walls)
-                max_y = max(w.y + w.length / 2 for w in walls)
+                # Calculate bounding box from walls in one pass over a
+                # compact float array instead of four generator sweeps
+                # with per-wall attribute lookups.
+                coords = np.array(
+                    [(w.x, w.y, w.width, w.length) for w in walls],
+                    dtype=np.float64,
+                )
+                half_w = coords[:, 2] / 2
+                half_l = coords[:, 3] / 2
+
+                min_x = float((coords[:, 0] - half_w).min())
+                max_x = float((coords[:, 0] + half_w).max())
+                min_y = float((coords[:, 1] - half_l).min())
+                max_y = float((coords[:, 1] + half_l).max())
 
                 # Add 20% margin
                 margin = 0.2
                 width = (max_x - min_x) * (1 + margin)
                 length = (max_y - min_y) * (1 + margin)
-
-                # Center position
-                center_x = (min_x + max_x) / 2
-                center_y = (min_y + max_y) / 2
             else:
                 width, length = 20.0, 20.0
-                center_x, center_y = 0.0, 0.0
         else:
             width, length = ground_size
-            center_x, center_y = 0.0, 0.0
-
-        # Create ground plane model
-        model = ET.SubElement(world, "model", name="ground_plane")
-
-        # Static
-        static = ET.SubElement(model, "static")
-        static.text = "true"
-
-        # Link
-        link = ET.SubElement(model, "link", name="link")
 
-        # Collision
-        collision = ET.SubElement(link, "collision", name="collision")
-        coll_geometry = ET.SubElement(collision, "geometry")
-        plane = ET.SubElement(coll_geometry, "plane")
-        normal = ET.SubElement(plane, "normal")
-        normal.text = "0 0 1"
-        size = ET.SubElement(plane, "size")
-        size.text = f"{width} {length}"
-
-        # Visual
-        visual = ET.SubElement(link, "visual", name="visual")
-        vis_geometry = ET.SubElement(visual, "geometry")
-        vis_plane = ET.SubElement(vis_geometry, "plane")
-        vis_normal = ET.SubElement(vis_plane, "normal")
-        vis_normal.text = "0 0 1"
-        vis_size = ET.SubElement(vis_plane, "size")
-        vis_size.text = f"{width} {length}"
-
-        # Material
-        material = ET.SubElement(visual, "material")
-        script = ET.SubElement(material, "script")
-        script_uri = ET.SubElement(script, "uri")
-        script_uri.text = "file://media/materials/scripts/gazebo.material"
-        script_name = ET.SubElement(script, "name")
-        script_name.text = "Gazebo/Grey"
+        buf.write(
+            f'    <model name="ground_plane">\n'
+            f"      <static>true</static>\n"
+            f'      <link name="link">\n'
+            f'        <collision name="collision">\n'
+            f"          <geometry>\n"
+            f"            <plane>\n"
+            f"              <normal>0 0 1</normal>\n"
+            f"              <size>{width} {length}</size>\n"
+            f"            </plane>\n"
+            f"          </geometry>\n"
+            f"        </collision>\n"
+            f'        <visual name="visual">\n'
+            f"          <geometry>\n"
+            f"            <plane>\n"
+            f"              <normal>0 0 1</normal>\n"
+            f"              <size>{width} {length}</size>\n"
+            f"            </plane>\n"
+            f"          </geometry>\n"
+            f"          <material>\n"
+            f"            <script>\n"
+            f"              <uri>file://media/materials/scripts/gazebo.material</uri>\n"
+            f"              <name>Gazebo/Grey</name>\n"
+            f"            </script>\n"
+            f"          </material>\n"
+            f"        </visual>\n"
+            f"      </link>\n"
+            f"    </model>\n"
+        )
 
-    def _add_wall(
-        self, world: ET.Element, wall: Wall, index: int, height: float, thickness: float
+    def _write_wall(
+        self, buf: StringIO, wall: Wall, index: int, height: float, thickness: float
     ):
         """
-        Add a wall model to the world.
+        Write a wall model to the buffer.
 
         Args:
-            world: World element
+            buf: Output buffer
             wall: Wall object
             index: Wall index for unique naming
             height: Wall height in meters
             thickness: Wall thickness (added to thinner dimension)
         """
-        model = ET.SubElement(world, "model", name=f"wall_{index}")
-
-        # Static
-        static = ET.SubElement(model, "static")
-        static.text = "true"
-
-        # Pose
-        pose = ET.SubElement(model, "pose")
-        pose.text = f"{wall.x} {wall.y} {height/2} 0 0 {wall.angle}"
-
-        # Link
-        link = ET.SubElement(model, "link", name="link")
-
-        # Determine box dimensions
         # The wall already has width and length from extraction
-        # We add thickness to make proper 3D boxes
-        box_x = wall.width
-        box_y = wall.length
-        box_z = height
-
-        # Collision
-        collision = ET.SubElement(link, "collision", name="collision")
-        coll_geometry = ET.SubElement(collision, "geometry")
-        box = ET.SubElement(coll_geometry, "box")
-        size = ET.SubElement(box, "size")
-        size.text = f"{box_x} {box_y} {box_z}"
-
-        # Visual
-        visual = ET.SubElement(link, "visual", name="visual")
-        vis_geometry = ET.SubElement(visual, "geometry")
-        vis_box = ET.SubElement(vis_geometry, "box")
-        vis_size = ET.SubElement(vis_box, "size")
-        vis_size.text = f"{box_x} {box_y} {box_z}"
-
-        # Material
-        material = ET.SubElement(visual, "material")
-        script = ET.SubElement(material, "script")
-        script_uri = ET.SubElement(script, "uri")
-        script_uri.text = "file://media/materials/scripts/gazebo.material"
-        script_name = ET.SubElement(script, "name")
-        script_name.text = "Gazebo/White"
+        buf.write(
+            _WALL_TEMPLATE.format(
+                index=index,
+                x=wall.x,
+                y=wall.y,
+                z=height / 2,
+                angle=wall.angle,
+                box_x=wall.width,
+                box_y=wall.length,
+                box_z=height,
+            )
+        )
 
-    def _prettify(self, elem: ET.Element) -> str:
+    def save_to_file(self, content: str, filepath: str):
         """
-        Return a pretty-printed XML string.
+        Save SDF content to file.
 
         Args:
-            elem: XML element
-
-        Returns:
-            Formatted XML string
+            content: SDF XML content
+            filepath: Output file path
         """
-        rough_string = ET.tostring(elem, encoding="utf-8")
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ", encoding="utf-8").decode("utf-8")
+        with open(filepath, "w") as f:
+            f.write(content)
 
-    def save_to_file(self, content: str, filepath: str):
+    def generate_to_file(
+        self,
+        walls: List[Wall],
+        filepath: str,
+        ground_size: Tuple[float, float] = None,
+        wall_height: float = 2.5,
+        wall_thickness: float = 0.15,
+    ):
         """
-        Save SDF content to file.
+        Generate the SDF world and stream it straight to a file.
+
+        Avoids materializing the full document as a string before
+        writing, keeping peak memory constant regardless of wall count.
 
         Args:
-            content: SDF XML content
+            walls: List of Wall objects
             filepath: Output file path
+            ground_size: Size of ground plane (width, length). If None, calculated from walls
+            wall_height: Height of walls in meters
+            wall_thickness: Thickness of walls in meters
         """
         with open(filepath, "w") as f:
-            f.write(content)
+            self.generate(
+                walls,
+                ground_size=ground_size,
+                wall_height=wall_height,
+                wall_thickness=wall_thickness,
+                out=f,
+            )
@@ -13,14 +13,18 @@ This significantly reduces segment count without removing any actual walls.
 """
 
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import Tuple
 
 
 class SegmentMerger:
     """
     Merge adjacent aligned wall segments to reduce total segment count.
 
-    This operates on aggregated segments, combining those that:
+    Operates on struct-of-arrays segment data: each segment type is an
+    (N, 3) integer array rather than a list of per-segment dictionaries,
+    so grouping and merging run as array passes instead of dict lookups.
+
+    Segments are combined when they:
     - Share the same orientation (both horizontal or both vertical)
     - Are perfectly aligned (same row/column)
     - Have exactly the same extent
@@ -35,113 +39,91 @@ class SegmentMerger:
         """
         self.merge_tolerance = merge_tolerance
 
-    def merge_segments(self, segments: List[dict], verbose: bool = True) -> List[dict]:
+    def merge_segments(
+        self,
+        h_segments: np.ndarray,
+        v_segments: np.ndarray,
+        verbose: bool = True,
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Merge adjacent aligned segments.
 
         Args:
-            segments: List of segment dictionaries with keys:
-                      'type' (horizontal/vertical), position, and extent info
+            h_segments: (N, 3) array of horizontal segments with columns
+                        (y, start_x, end_x)
+            v_segments: (N, 3) array of vertical segments with columns
+                        (x, start_y, end_y)
             verbose: Whether to print progress messages
 
         Returns:
-            List of merged segments (same format as input)
+            Tuple of (horizontal_boxes, vertical_boxes), each an (M, 4)
+            array with columns (start_x, end_x, start_y, end_y)
         """
-        if len(segments) == 0:
-            return []
+        total = len(h_segments) + len(v_segments)
 
         if verbose:
             print(
                 f"\n   Merging adjacent segments (tolerance: {self.merge_tolerance*100:.1f}cm)..."
             )
-            print(f"      Before merging: {len(segments)} segments")
+            print(f"      Before merging: {total} segments")
 
-        horizontal = [s for s in segments if s["type"] == "horizontal"]
-        vertical = [s for s in segments if s["type"] == "vertical"]
+        # Horizontal runs merge across consecutive rows, vertical runs
+        # across consecutive columns; the helper is orientation-agnostic.
+        merged_h = self._merge_runs(h_segments)
+        merged_v = self._merge_runs(v_segments)
 
-        merged_horizontal = self._merge_horizontal_segments(horizontal)
-        merged_vertical = self._merge_vertical_segments(vertical)
+        # Reorder vertical output (start_y, end_y, x_min, x_max) into the
+        # shared (start_x, end_x, start_y, end_y) box layout.
+        merged_v = merged_v[:, [2, 3, 0, 1]]
 
-        merged_segments = merged_horizontal + merged_vertical
+        merged_total = len(merged_h) + len(merged_v)
 
         if verbose:
-            print(f"      After merging: {len(merged_segments)} segments")
-            reduction = len(segments) - len(merged_segments)
-            if len(segments) > 0:
-                percent = (reduction / len(segments)) * 100
+            print(f"      After merging: {merged_total} segments")
+            reduction = total - merged_total
+            if total > 0:
+                percent = (reduction / total) * 100
                 print(f"      Reduction: {reduction} segments ({percent:.1f}%)")
 
-        return merged_segments
-
-    def _merge_horizontal_segments(self, segments: List[dict]) -> List[dict]:
-        """Merge horizontal segments on adjacent rows with the same extent."""
-        if len(segments) == 0:
-            return []
-
-        extent_groups: Dict[Tuple[int, int], List[dict]] = {}
-        for seg in segments:
-            extent = (seg["start_x"], seg["end_x"])
-            if extent not in extent_groups:
-                extent_groups[extent] = []
-            extent_groups[extent].append(seg)
-
-        merged = []
+        return merged_h, merged_v
 
-        for extent, extent_segments in extent_groups.items():
-            extent_segments.sort(key=lambda s: s["y"])
-
-            current = extent_segments[0].copy()
-            current["start_y"] = current["y"]
-            current["end_y"] = current["y"]
-
-            for i in range(1, len(extent_segments)):
-                next_seg = extent_segments[i]
-
-                if next_seg["y"] == current["end_y"] + 1:
-                    current["end_y"] = next_seg["y"]
-                else:
-                    merged.append(current)
-                    current = next_seg.copy()
-                    current["start_y"] = current["y"]
-                    current["end_y"] = current["y"]
-
-            merged.append(current)
+    @staticmethod
+    def _merge_runs(segments: np.ndarray) -> np.ndarray:
+        """
+        Merge runs that share the same extent and sit on consecutive positions.
 
-        return merged
+        Args:
+            segments: (N, 3) array with columns (pos, start, end)
 
-    def _merge_vertical_segments(self, segments: List[dict]) -> List[dict]:
-        """Merge vertical segments on adjacent columns with the same extent."""
+        Returns:
+            (M, 4) array with columns (start, end, pos_min, pos_max)
+        """
         if len(segments) == 0:
-            return []
-
-        extent_groups: Dict[Tuple[int, int], List[dict]] = {}
-        for seg in segments:
-            extent = (seg["start_y"], seg["end_y"])
-            if extent not in extent_groups:
-                extent_groups[extent] = []
-            extent_groups[extent].append(seg)
-
-        merged = []
-
-        for extent, extent_segments in extent_groups.items():
-
-            extent_segments.sort(key=lambda s: s["x"])
-
-            current = extent_segments[0].copy()
-            current["start_x"] = current["x"]
-            current["end_x"] = current["x"]
-
-            for i in range(1, len(extent_segments)):
-                next_seg = extent_segments[i]
-
-                if next_seg["x"] == current["end_x"] + 1:
-                    current["end_x"] = next_seg["x"]
-                else:
-                    merged.append(current)
-                    current = next_seg.copy()
-                    current["start_x"] = current["x"]
-                    current["end_x"] = current["x"]
-
-            merged.append(current)
-
-        return merged
+            return np.empty((0, 4), dtype=np.int64)
+
+        # Sort by extent first, position last, so mergeable runs become
+        # consecutive rows with positions increasing by exactly 1.
+        order = np.lexsort((segments[:, 0], segments[:, 2], segments[:, 1]))
+        ordered = segments[order]
+
+        pos = ordered[:, 0]
+        start = ordered[:, 1]
+        end = ordered[:, 2]
+
+        # A merged run breaks wherever the extent changes or the positions
+        # stop being consecutive; everything between breaks collapses.
+        breaks = np.empty(len(ordered), dtype=bool)
+        breaks[0] = True
+        breaks[1:] = (
+            (start[1:] != start[:-1])
+            | (end[1:] != end[:-1])
+            | (pos[1:] != pos[:-1] + 1)
+        )
+
+        group_starts = np.flatnonzero(breaks)
+        pos_min = pos[group_starts]
+        pos_max = np.maximum.reduceat(pos, group_starts)
+
+        return np.column_stack(
+            (start[group_starts], end[group_starts], pos_min, pos_max)
+        ).astype(np.int64)
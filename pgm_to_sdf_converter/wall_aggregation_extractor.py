@@ -17,8 +17,61 @@ from typing import List, Tuple
 from dataclasses import dataclass
 from .segment_merger import SegmentMerger
 
+# Numba is optional; when present the run-finding scan compiles to a
+# single fused loop per axis instead of several NumPy passes.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+
+    @njit(parallel=True, cache=True)
+    def _threshold_jit(image, thresh, invert):
+        """Write the occupancy comparison directly into a uint8 grid."""
+        height, width = image.shape
+        out = np.empty((height, width), dtype=np.uint8)
+
+        for y in prange(height):
+            for x in range(width):
+                if invert:
+                    out[y, x] = 1 if image[y, x] <= thresh else 0
+                else:
+                    out[y, x] = 1 if image[y, x] >= thresh else 0
+
+        return out
+
+    @njit(cache=True)
+    def _find_runs_jit(grid):
+        """Find all maximal runs of 1s along each row in one compiled pass."""
+        height, width = grid.shape
+
+        # Upper bound: runs alternate with gaps, so at most ceil(W/2) per row.
+        cap = grid.size // 2 + height
+        rows = np.empty(cap, dtype=np.int64)
+        starts = np.empty(cap, dtype=np.int64)
+        ends = np.empty(cap, dtype=np.int64)
+
+        count = 0
+        for y in range(height):
+            x = 0
+            while x < width:
+                if grid[y, x] == 1:
+                    start = x
+                    while x < width and grid[y, x] == 1:
+                        x += 1
+                    rows[count] = y
+                    starts[count] = start
+                    ends[count] = x - 1
+                    count += 1
+                else:
+                    x += 1
 
-@dataclass
+        return rows[:count], starts[:count], ends[:count]
+
+
+@dataclass(slots=True)
 class Wall:
     """Represents a wall segment in world coordinates."""
 
@@ -98,13 +151,22 @@ class WallAggregationExtractor:
         h_segments = self._aggregate_horizontal(occupied_grid)
         v_segments = self._aggregate_vertical(occupied_grid, h_segments)
 
-        all_segments = h_segments + v_segments
-        total_before_merge = len(all_segments)
+        total_before_merge = len(h_segments) + len(v_segments)
 
         if self.enable_merging and self.merger is not None:
-            all_segments = self.merger.merge_segments(all_segments, verbose=False)
+            h_boxes, v_boxes = self.merger.merge_segments(
+                h_segments, v_segments, verbose=False
+            )
+        else:
+            # Unmerged runs become degenerate one-row / one-column boxes.
+            h_boxes = np.column_stack(
+                (h_segments[:, 1], h_segments[:, 2], h_segments[:, 0], h_segments[:, 0])
+            )
+            v_boxes = np.column_stack(
+                (v_segments[:, 0], v_segments[:, 0], v_segments[:, 1], v_segments[:, 2])
+            )
 
-        walls = self._segments_to_walls(all_segments)
+        walls = self._segments_to_walls(np.vstack((h_boxes, v_boxes)))
 
         print(f"\n  Wall segments: {len(walls)}")
         if self.enable_merging and total_before_merge > len(walls):
@@ -118,149 +180,152 @@ class WallAggregationExtractor:
 
     def _get_occupied_grid(self) -> np.ndarray:
         """Create binary occupancy grid from image data."""
-        if self.image_data.max() > 1:
-            normalized = self.image_data.astype(np.float32) / 255.0
-        else:
-            normalized = self.image_data.astype(np.float32)
-
+        image = self.image_data
+
+        if image.max() > 1:
+            # Compare in integer space; normalizing to [0, 1] just to
+            # threshold would allocate a float32 copy of the whole map.
+            if self.negate:
+                # 1 - v/255 >= thresh  <=>  v <= 255 * (1 - thresh)
+                thresh_uint = int(np.floor(255 * (1.0 - self.occupied_thresh)))
+            else:
+                # v/255 >= thresh  <=>  v >= ceil(255 * thresh)
+                thresh_uint = int(np.ceil(255 * self.occupied_thresh))
+
+            # Numba cannot type non-native dtypes such as the big-endian
+            # >u2 arrays the parser returns for 16-bit binary PGMs; those
+            # fall through to the NumPy comparisons below.
+            if njit is not None and image.dtype.isnative:
+                # Fused compiled kernel: no intermediate bool array, and
+                # rows are thresholded in parallel.
+                return _threshold_jit(image, thresh_uint, bool(self.negate))
+
+            if self.negate:
+                return (image <= thresh_uint).astype(np.uint8)
+            return (image >= thresh_uint).astype(np.uint8)
+
+        # Already-normalized (0/1 or probability) grids keep the float path.
+        normalized = image.astype(np.float32)
         if self.negate:
             occupancy_prob = 1.0 - normalized
         else:
             occupancy_prob = normalized
 
-        occupied = (occupancy_prob >= self.occupied_thresh).astype(np.uint8)
-        return occupied
+        return (occupancy_prob >= self.occupied_thresh).astype(np.uint8)
 
-    def _aggregate_horizontal(self, grid: np.ndarray) -> List[dict]:
-        """Find all maximal horizontal segments."""
-        height, width = grid.shape
-        horizontal_segments = []
+    @staticmethod
+    def _find_runs(grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find all maximal runs of 1s along each row of a binary grid.
 
-        for y in range(height):
-            x = 0
-            while x < width:
-                if grid[y, x] == 1 and (x == 0 or grid[y, x - 1] == 0):
-                    start_x = x
-
-                    end_x = x
-                    while end_x + 1 < width and grid[y, end_x + 1] == 1:
-                        end_x += 1
-
-                    segment = {
-                        "type": "horizontal",
-                        "y": y,
-                        "start_x": start_x,
-                        "end_x": end_x,
-                        "length_px": end_x - start_x + 1,
-                    }
-                    horizontal_segments.append(segment)
-
-                    x = end_x + 1
-                else:
-                    x += 1
+        Pads each row with zeros and takes the discrete difference: a +1
+        step marks a run start and a -1 step the pixel after its end, so
+        all runs fall out of two vectorized comparisons. Starts and ends
+        pair up index-for-index because they alternate within each row.
 
-        return horizontal_segments
+        Returns:
+            Tuple of (row_indices, run_starts, run_ends) arrays
+        """
+        if njit is not None:
+            return _find_runs_jit(grid)
 
-    def _aggregate_vertical(
-        self, grid: np.ndarray, horizontal_segments: List[dict]
-    ) -> List[dict]:
-        """Find all maximal vertical segments from remaining pixels."""
-        height, width = grid.shape
-        grid_for_vertical = grid.copy()
-
-        for seg in horizontal_segments:
-            if seg["length_px"] > 1:
-                y = seg["y"]
-                start_x = seg["start_x"]
-                end_x = seg["end_x"]
-                grid_for_vertical[y, start_x : end_x + 1] = 0
-
-        vertical_segments = []
-
-        for x in range(width):
-            y = 0
-            while y < height:
-                if grid_for_vertical[y, x] == 1 and (
-                    y == 0 or grid_for_vertical[y - 1, x] == 0
-                ):
-                    start_y = y
-
-                    end_y = y
-                    while end_y + 1 < height and grid_for_vertical[end_y + 1, x] == 1:
-                        end_y += 1
-
-                    segment = {
-                        "type": "vertical",
-                        "x": x,
-                        "start_y": start_y,
-                        "end_y": end_y,
-                        "length_px": end_y - start_y + 1,
-                    }
-                    vertical_segments.append(segment)
-
-                    y = end_y + 1
-                else:
-                    y += 1
+        # Empty rows dominate typical occupancy maps; drop them up front
+        # so the pad/diff pass only touches rows that can hold a run.
+        active = np.flatnonzero(grid.any(axis=1))
+        if len(active) < grid.shape[0]:
+            grid = grid[active]
 
-        return vertical_segments
+        padded = np.pad(grid, ((0, 0), (1, 1))).astype(np.int8)
+        d = np.diff(padded, axis=1)
 
-    def _segments_to_walls(self, segments: List[dict]) -> List[Wall]:
-        """Convert segments to Wall objects."""
-        walls = []
+        rows, starts = np.nonzero(d == 1)
+        _, ends = np.nonzero(d == -1)
 
-        for seg in segments:
-            if seg["type"] == "horizontal":
-                start_x_px = seg["start_x"]
-                end_x_px = seg["end_x"]
+        return active[rows], starts, ends - 1
 
-                if "start_y" in seg and "end_y" in seg:
-                    start_y_px = seg["start_y"]
-                    end_y_px = seg["end_y"]
-                else:
-                    start_y_px = seg["y"]
-                    end_y_px = seg["y"]
+    def _aggregate_horizontal(self, grid: np.ndarray) -> np.ndarray:
+        """
+        Find all maximal horizontal segments.
 
-                center_x_px = (start_x_px + end_x_px) / 2.0
-                center_y_px = (start_y_px + end_y_px) / 2.0
+        Returns:
+            (N, 3) array with columns (y, start_x, end_x)
+        """
+        ys, starts, ends = self._find_runs(grid)
+        return np.column_stack((ys, starts, ends))
 
-                width_px = end_x_px - start_x_px + 1
-                height_px = end_y_px - start_y_px + 1
+    def _aggregate_vertical(
+        self, grid: np.ndarray, horizontal_segments: np.ndarray
+    ) -> np.ndarray:
+        """
+        Find all maximal vertical segments from remaining pixels.
 
-            else:
-                start_y_px = seg["start_y"]
-                end_y_px = seg["end_y"]
+        Args:
+            grid: Binary occupancy grid
+            horizontal_segments: (N, 3) array with columns (y, start_x, end_x)
 
-                if "start_x" in seg and "end_x" in seg:
-                    start_x_px = seg["start_x"]
-                    end_x_px = seg["end_x"]
-                else:
-                    start_x_px = seg["x"]
-                    end_x_px = seg["x"]
+        Returns:
+            (N, 3) array with columns (x, start_y, end_y)
+        """
+        height, width = grid.shape
 
-                center_x_px = (start_x_px + end_x_px) / 2.0
-                center_y_px = (start_y_px + end_y_px) / 2.0
+        # Only spans longer than one pixel claim their pixels.
+        claimed = horizontal_segments[
+            horizontal_segments[:, 2] > horizontal_segments[:, 1]
+        ]
 
-                width_px = end_x_px - start_x_px + 1
-                height_px = end_y_px - start_y_px + 1
+        if len(claimed) > 0:
+            # Scatter all claimed spans at once: +1 at each start, -1 one
+            # past each end, then a row-wise prefix sum marks every pixel
+            # covered by a horizontal segment. One C-level pass instead of
+            # a Python slice assignment per segment.
+            ys, sx, ex = claimed[:, 0], claimed[:, 1], claimed[:, 2]
 
-            center_world = self._pixel_to_world(np.array([center_x_px, center_y_px]))
-            width_m = width_px * self.resolution
-            length_m = height_px * self.resolution
+            cuts = np.zeros((height, width + 1), dtype=np.int32)
+            np.add.at(cuts, (ys, sx), 1)
+            np.add.at(cuts, (ys, ex + 1), -1)
+            covered = cuts[:, :-1].cumsum(axis=1) > 0
 
-            wall = Wall(
-                x=center_world[0],
-                y=center_world[1],
-                width=width_m,
-                length=length_m,
-                angle=0.0,
-            )
-            walls.append(wall)
+            grid_for_vertical = np.where(covered, np.uint8(0), grid)
+        else:
+            grid_for_vertical = grid
 
-        return walls
+        # Transpose so each column becomes a row; run starts and ends then
+        # pair up per column just as in the horizontal pass.
+        xs, starts, ends = self._find_runs(grid_for_vertical.T)
+        return np.column_stack((xs, starts, ends))
 
-    def _pixel_to_world(self, pixel_coords: np.ndarray) -> Tuple[float, float]:
-        """Convert pixel coordinates to world coordinates."""
-        x_px, y_px = pixel_coords
-        x_world = self.origin[0] + x_px * self.resolution
-        y_world = self.origin[1] + (self.height - y_px) * self.resolution
-        return (x_world, y_world)
+    def _segments_to_walls(self, boxes: np.ndarray) -> List[Wall]:
+        """
+        Convert segment bounding boxes to Wall objects.
+
+        Args:
+            boxes: (N, 4) array with columns (start_x, end_x, start_y, end_y)
+                   in pixel coordinates
+
+        Returns:
+            List of Wall objects in world coordinates
+        """
+        if len(boxes) == 0:
+            return []
+
+        # Whole-array arithmetic for every center and size; Wall objects
+        # are only materialized once at the end.
+        start_x, end_x, start_y, end_y = boxes.T.astype(np.float64)
+
+        center_x_px = (start_x + end_x) / 2.0
+        center_y_px = (start_y + end_y) / 2.0
+
+        x_world = self.origin[0] + center_x_px * self.resolution
+        y_world = self.origin[1] + (self.height - center_y_px) * self.resolution
+        widths_m = (end_x - start_x + 1) * self.resolution
+        lengths_m = (end_y - start_y + 1) * self.resolution
+
+        return [
+            Wall(x=x, y=y, width=width_m, length=length_m, angle=0.0)
+            for x, y, width_m, length_m in zip(
+                x_world.tolist(),
+                y_world.tolist(),
+                widths_m.tolist(),
+                lengths_m.tolist(),
+            )
+        ]
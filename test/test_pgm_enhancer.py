@@ -0,0 +1,31 @@
+"""Tests for the morphological closing helper in pgm_enhancer."""
+
+import numpy as np
+import pytest
+
+from pgm_to_sdf_converter import pgm_enhancer
+from pgm_to_sdf_converter.pgm_enhancer import PGMEnhancer
+
+
+@pytest.mark.skipif(pgm_enhancer.cv2 is None, reason="OpenCV not installed")
+@pytest.mark.parametrize(
+    "size,iterations",
+    [
+        (3, 1),
+        (4, 1),  # even size: cv2 needs a mirrored erode anchor
+        (4, 2),
+        (5, 1),
+    ],
+)
+def test_binary_close_cv2_matches_ndimage(monkeypatch, size, iterations):
+    """The cv2 and ndimage closing paths must produce identical masks."""
+    rng = np.random.default_rng(42)
+    mask = (rng.random((64, 64)) < 0.2).astype(np.uint8)
+
+    enhancer = PGMEnhancer()
+    via_cv2 = enhancer._binary_close(mask, size, iterations)
+
+    monkeypatch.setattr(pgm_enhancer, "cv2", None)
+    via_ndimage = enhancer._binary_close(mask, size, iterations)
+
+    np.testing.assert_array_equal(via_cv2, via_ndimage)